@@ -5,88 +5,180 @@ from __future__ import annotations
 
 import argparse
 import csv
-import math
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from statistics import mean, median
 
-import matplotlib
+import numpy as np
 
-# GUI無し環境でも保存できるように
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
+
+# confirm_ms などで "timeout" が入る場合を弾く（nan/none/null と同様に欠損扱い）
+_MISSING_TOKENS = {"nan", "none", "null", "timeout", "time_out"}
+
+
+# 数値として受け付ける文字列（"", timeout, nan 等はここで弾かれる）
+_NUM_RE = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
 
 
 def _to_float(x: str) -> float | None:
     if x is None:
         return None
-    s = str(x).strip()
-    if s == "" or s.lower() in {"nan", "none", "null"}:
-        return None
-    # confirm_ms などで "timeout" が入る場合を弾く
-    if s.lower() in {"timeout", "time_out"}:
-        return None
-    try:
-        return float(s)
-    except ValueError:
+    s = x.strip()
+    # 例外を制御フローに使わず、正規表現で数値かどうかを先に判定する
+    if _NUM_RE.fullmatch(s) is None:
         return None
+    return float(s)
+
 
+def _pandas():
+    # pandas の import も重い（~250ms）ので、--help 等では読み込まない。未インストールなら None
+    if not hasattr(_pandas, "pd"):
+        try:
+            import pandas as pd  # type: ignore
+        except ImportError:
+            pd = None
+        _pandas.pd = pd
+    return _pandas.pd
 
-def read_column(csv_path: Path, col: str) -> list[float]:
+
+def _read_column_pandas(pd, csv_path: Path, col: str) -> np.ndarray:
+    try:
+        header = pd.read_csv(csv_path, nrows=0, encoding="utf-8").columns
+    except pd.errors.EmptyDataError:
+        raise RuntimeError("CSV header not found.") from None
+    if col not in header:
+        raise KeyError(f"Column '{col}' not found. Available: {list(header)}")
+
+    # 列単位で C パーサに読ませ、数値化・欠損除去をまとめてベクトル演算で行う
+    s = pd.read_csv(csv_path, usecols=[col], dtype=str, keep_default_na=False, encoding="utf-8")[col]
+    s = s.str.strip()
+    s = s.mask(s.str.lower().isin(_MISSING_TOKENS))
+    arr = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64)
+    return arr[np.isfinite(arr)]
+
+
+def _read_column_csv(csv_path: Path, col: str) -> np.ndarray:
+    # pandas 無しの環境向け: 行ごとの dict を作らず列インデックスで1列だけ取り出す
     vals: list[float] = []
     with csv_path.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
             raise RuntimeError("CSV header not found.")
-        if col not in reader.fieldnames:
-            raise KeyError(f"Column '{col}' not found. Available: {reader.fieldnames}")
+        if col not in header:
+            raise KeyError(f"Column '{col}' not found. Available: {header}")
+        idx = header.index(col)
 
         for row in reader:
-            v = _to_float(row.get(col, ""))
-            if v is not None and math.isfinite(v):
+            v = _to_float(row[idx]) if idx < len(row) else None
+            if v is not None:
                 vals.append(v)
 
-    return vals
+    arr = np.asarray(vals, dtype=np.float64)
+    return arr[np.isfinite(arr)]
+
+
+def read_column(csv_path: Path, col: str) -> np.ndarray:
+    pd = _pandas()
+    if pd is not None:
+        return _read_column_pandas(pd, csv_path, col)
+    return _read_column_csv(csv_path, col)
+
+
+def describe(vals: np.ndarray) -> dict[str, float]:
+    a = np.asarray(vals)
+    n = int(a.size)
+    if n == 0:
+        return {"n": 0}
+
+    # linear interpolation percentile（np.percentile は内部で partition を使う）
+    p50, p95 = np.percentile(a, [50, 95])
+
+    return {
+        "n": n,
+        "min": float(a.min()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "max": float(a.max()),
+        "mean": float(a.mean()),
+        "median": float(p50),
+    }
 
 
-def describe(vals: list[float]) -> dict[str, float]:
-    vals_sorted = sorted(vals)
-    n = len(vals_sorted)
+def describe_approx(vals: np.ndarray, bins: int = 4096) -> dict[str, float]:
+    """
+    巨大な CSV 向けの近似版: 細かいヒストグラム1回（O(N)、ソート無し）から
+    パーセンタイルを推定する。describe() と同じ順位 p*(n-1) の線形補間で、
+    各順位の値はそれを含むビン内で推定するので、誤差は1ビン幅 (max - min) / bins 未満。
+    min/max/mean は厳密値。
+    """
+    a = np.asarray(vals)
+    n = int(a.size)
     if n == 0:
         return {"n": 0}
 
-    def pct(p: float) -> float:
-        # linear interpolation percentile
-        idx = (n - 1) * p
-        lo = int(math.floor(idx))
-        hi = int(math.ceil(idx))
-        if lo == hi:
-            return vals_sorted[lo]
-        return vals_sorted[lo] + (vals_sorted[hi] - vals_sorted[lo]) * (idx - lo)
+    vmin = float(a.min())
+    vmax = float(a.max())
+    if vmin == vmax:
+        p50 = p95 = vmin
+    else:
+        counts, edges = np.histogram(a, bins=bins, range=(vmin, vmax))
+        cum = np.cumsum(counts)
+
+        def at_rank(k: np.ndarray) -> np.ndarray:
+            # k 番目（0始まり）の値: それを含むビン内で一様に並んでいると仮定
+            i = np.searchsorted(cum, k, side="right")
+            j = k - (cum[i] - counts[i])
+            return edges[i] + (j + 0.5) / counts[i] * (edges[i + 1] - edges[i])
+
+        rank = np.array([0.50, 0.95]) * (n - 1)
+        lo = np.floor(rank).astype(np.int64)
+        hi = np.ceil(rank).astype(np.int64)
+        v_lo = at_rank(lo)
+        v_hi = at_rank(hi)
+        p50, p95 = (v_lo + (v_hi - v_lo) * (rank - lo)).tolist()
 
     return {
         "n": n,
-        "min": vals_sorted[0],
-        "p50": pct(0.50),
-        "p95": pct(0.95),
-        "max": vals_sorted[-1],
-        "mean": mean(vals_sorted),
-        "median": median(vals_sorted),
+        "min": vmin,
+        "p50": float(p50),
+        "p95": float(p95),
+        "max": vmax,
+        "mean": float(a.mean()),
+        "median": float(p50),
     }
 
 
-def plot_hist(vals: list[float], title: str, xlabel: str, out_png: Path, bins: int = 30) -> None:
+def _pyplot():
+    # matplotlib の import は重い（~300ms）ので、CSV を読めてから初めて読み込む
+    plt = getattr(_pyplot, "plt", None)
+    if plt is None:
+        import matplotlib
+
+        # GUI無し環境でも保存できるように
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        _pyplot.plt = plt
+    return plt
+
+
+def plot_hist(ax, vals: np.ndarray, title: str, xlabel: str, out_png: Path, bins: int = 30) -> None:
     if len(vals) == 0:
         raise RuntimeError(f"No numeric data to plot for: {title}")
 
-    plt.figure()
-    plt.hist(vals, bins=bins)
-    plt.title(title)
-    plt.xlabel(xlabel)
-    plt.ylabel("count")
-    plt.tight_layout()
+    # 同じ Figure/Axes を使い回す（backend やフォントキャッシュの初期化を毎回しない）
+    fig = ax.figure
+    ax.clear()
+    # 統計は float64 のまま計算し、ビニングだけ float32 で行う（帯域が半分で済む。
+    # 16384ms を超える値では float32 の刻みが 0.001 より粗いので統計には使わない）
+    ax.hist(np.asarray(vals, dtype=np.float32), bins=bins)
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("count")
+    fig.tight_layout()
     out_png.parent.mkdir(parents=True, exist_ok=True)
-    plt.savefig(out_png, dpi=200)
-    plt.close()
+    fig.savefig(out_png, dpi=200)
 
 
 def main() -> None:
@@ -95,48 +187,66 @@ def main() -> None:
     ap.add_argument("--bins", type=int, default=30, help="Histogram bins (default: 30)")
     ap.add_argument("--outdir", type=str, default="plots", help="Output directory (default: plots)")
     ap.add_argument("--prefix", type=str, default="", help="Output file prefix (optional)")
+    stats = ap.add_mutually_exclusive_group()
+    stats.add_argument("--approx", action="store_true", help="Approximate p50/p95 from a histogram (no sort; for huge CSVs)")
+    stats.add_argument("--no-stats", action="store_true", help="Only write the PNGs; skip the summary statistics")
     args = ap.parse_args()
 
+    summarize = None if args.no_stats else (describe_approx if args.approx else describe)
+
     csv_path = Path(args.csv).expanduser().resolve()
     outdir = Path(args.outdir).expanduser().resolve()
     prefix = args.prefix
 
-    # 1) broadcast_ms
-    broadcast = read_column(csv_path, "broadcast_ms")
-    stat_b = describe(broadcast)
-    print("[broadcast_ms]", stat_b)
-
-    out_b = outdir / f"{prefix}hist_broadcast_ms.png"
-    plot_hist(
-        broadcast,
-        title=f"broadcast_ms histogram (n={stat_b.get('n', 0)})",
-        xlabel="broadcast_ms (ms)",
-        out_png=out_b,
-        bins=args.bins,
-    )
-    print(f"[✓] wrote: {out_b}")
-
-    # 2) confirm_ms（存在すれば）
-    try:
-        confirm = read_column(csv_path, "confirm_ms")
-    except KeyError:
-        confirm = []
-
-    if len(confirm) > 0:
-        stat_c = describe(confirm)
-        print("[confirm_ms]", stat_c)
-
-        out_c = outdir / f"{prefix}hist_confirm_ms.png"
-        plot_hist(
-            confirm,
-            title=f"confirm_ms histogram (n={stat_c.get('n', 0)})",
-            xlabel="confirm_ms (ms)",
-            out_png=out_c,
-            bins=args.bins,
-        )
-        print(f"[✓] wrote: {out_c}")
-    else:
-        print("[info] confirm_ms column not found or has no numeric data; skipped.")
+    # CSV 読み込み（I/O）は2列ともスレッドで先行させ、描画・保存はメインスレッドで
+    # 1つの Figure を使って順に行う（matplotlib はスレッドセーフではないため）
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_b = ex.submit(read_column, csv_path, "broadcast_ms")
+        fut_c = ex.submit(read_column, csv_path, "confirm_ms")
+
+        # 1) broadcast_ms
+        broadcast = fut_b.result()
+        if summarize is not None:
+            print("[broadcast_ms]", summarize(broadcast))
+
+        plt = _pyplot()
+        fig, ax = plt.subplots()
+        try:
+            out_b = outdir / f"{prefix}hist_broadcast_ms.png"
+            plot_hist(
+                ax,
+                broadcast,
+                title=f"broadcast_ms histogram (n={len(broadcast)})",
+                xlabel="broadcast_ms (ms)",
+                out_png=out_b,
+                bins=args.bins,
+            )
+            print(f"[✓] wrote: {out_b}")
+
+            # 2) confirm_ms（存在すれば）
+            try:
+                confirm = fut_c.result()
+            except KeyError:
+                confirm = []
+
+            if len(confirm) > 0:
+                if summarize is not None:
+                    print("[confirm_ms]", summarize(confirm))
+
+                out_c = outdir / f"{prefix}hist_confirm_ms.png"
+                plot_hist(
+                    ax,
+                    confirm,
+                    title=f"confirm_ms histogram (n={len(confirm)})",
+                    xlabel="confirm_ms (ms)",
+                    out_png=out_c,
+                    bins=args.bins,
+                )
+                print(f"[✓] wrote: {out_c}")
+            else:
+                print("[info] confirm_ms column not found or has no numeric data; skipped.")
+        finally:
+            plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -8,15 +8,18 @@ import hashlib
 import json
 import logging
 import os
+import queue
 import random
 import subprocess
 import sys
+import threading
 import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
 # ===== IMPORTANT: fix gpiozero backend BEFORE importing waveshare_epd =====
 os.environ.setdefault("GPIOZERO_PIN_FACTORY", os.environ.get("GPIOZERO_PIN_FACTORY", "lgpio"))
@@ -29,6 +32,7 @@ if os.path.exists(libdir):
     sys.path.append(libdir)
 
 from waveshare_epd import epd2in7_V2 as epd2in7  # type: ignore
+import numpy as np  # type: ignore
 from PIL import Image, ImageDraw, ImageFont  # type: ignore
 import qrcode  # type: ignore
 
@@ -48,6 +52,14 @@ SLEEP_BETWEEN_SEC = float(os.environ.get("SLEEP_BETWEEN_SEC", "0"))
 
 SEND_FULL_PAYLOAD = os.environ.get("SEND_FULL_PAYLOAD", "1") == "1"
 INCLUDE_TXHASH_IN_QR = os.environ.get("INCLUDE_TXHASH_IN_QR", "1") == "1"
+# "" => qrcode evaluates all 8 masks (spec default); "0".."7" => fixed mask, ~4x faster encode
+_qr_mask_env = os.environ.get("QR_MASK_PATTERN", "").strip()
+QR_MASK_PATTERN: Optional[int] = int(_qr_mask_env) if _qr_mask_env else None
+if QR_MASK_PATTERN is not None and QR_MASK_PATTERN not in range(8):
+    # fail at startup, not at the first render (after a Tx was already broadcast)
+    raise ValueError(f"QR_MASK_PATTERN must be 0..7 or empty, got {_qr_mask_env!r}")
+# "Sending TX..." / "TX OK" screens cost a panel refresh each; off by default
+SKIP_STATUS_SCREENS = os.environ.get("SKIP_STATUS_SCREENS", "1") == "1"
 
 NODE_SEND_TIMEOUT_SEC = float(os.environ.get("NODE_SEND_TIMEOUT_SEC", "180"))
 
@@ -58,33 +70,6 @@ NET_PROFILE_JSON = os.environ.get("NET_PROFILE_JSON", "").strip()
 NET_SEED_OVERRIDE = os.environ.get("NET_SEED", "").strip()
 
 
-@dataclass
-class Timing:
-    t0_ns: int
-    t1_ns: int
-    t2_ns: int
-
-    @staticmethod
-    def now_ns() -> int:
-        return time.perf_counter_ns()
-
-    @staticmethod
-    def ns_to_ms(ns: int) -> float:
-        return ns / 1e6
-
-    @property
-    def txhash_ms(self) -> float:
-        return self.ns_to_ms(self.t1_ns - self.t0_ns)
-
-    @property
-    def display_ms(self) -> float:
-        return self.ns_to_ms(self.t2_ns - self.t1_ns)
-
-    @property
-    def total_ms(self) -> float:
-        return self.ns_to_ms(self.t2_ns - self.t0_ns)
-
-
 @dataclass
 class EmulationProfile:
     name: str = "baseline"
@@ -312,9 +297,9 @@ def make_payload(node_id: str) -> Dict[str, Any]:
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     qr_id = uuid.uuid4().hex
 
-    source_hash = {"node_id": node_id, "qr_id": qr_id, "timestamp": timestamp}
-    source_string = json.dumps(source_hash, sort_keys=True)
-    unique_id = hashlib.sha256(source_string.encode("utf-8")).hexdigest()
+    # fixed-shape canonical source "node_id|qr_id|timestamp" (no JSON encode per call)
+    source = f"{node_id}|{qr_id}|{timestamp}".encode("utf-8")
+    unique_id = hashlib.sha256(source).hexdigest()
 
     return {
         "node_id": node_id,
@@ -326,7 +311,27 @@ def make_payload(node_id: str) -> Dict[str, Any]:
     }
 
 
-def display_message(epd, font, message: str):
+def fast_getbuffer(epd, image: Image.Image) -> bytes:
+    """
+    Same buffer as epd.getbuffer() (1 bit/pixel, MSB = leftmost, white = 1),
+    but packed with NumPy instead of a per-pixel Python loop.
+    """
+    arr = np.asarray(image.convert("1"), dtype=bool)
+    if arr.shape == (epd.width, epd.height):
+        # landscape image: rotate into panel orientation like epd.getbuffer()
+        arr = arr[:, ::-1].T
+    elif arr.shape != (epd.height, epd.width):
+        raise ValueError(f"image size {image.size} does not match panel {epd.width}x{epd.height}")
+    return np.packbits(arr, axis=1).tobytes()
+
+
+@lru_cache(maxsize=16)
+def _status_frame(epd, font, message: str) -> bytes:
+    """
+    Packed frame for a centered status message. The messages are a few
+    fixed literals, so measuring/drawing/packing happens once per
+    (font, message) and later calls only push the cached buffer.
+    """
     message = safe_text(message)
 
     image = Image.new("1", (epd.width, epd.height), 255)
@@ -345,46 +350,121 @@ def display_message(epd, font, message: str):
     y = (epd.height - h) // 2
 
     draw.text((x, y), message, font=font, fill=0)
-    epd.display(epd.getbuffer(image))
+    return fast_getbuffer(epd, image)
+
+
+def display_message(epd, font, message: str):
+    # status screens are transient: partial refresh (~0.3s) instead of a full one (~2s).
+    # Requires the base image set by clear_screen(); see display_full().
+    epd.display_Partial(_status_frame(epd, font, message), 0, 0, epd.width, epd.height)
+
+
+def clear_screen(epd) -> None:
+    if SKIP_STATUS_SCREENS:
+        epd.Clear()
+        return
+    # Partial refresh compares against the "old" RAM (0x26), which Clear()
+    # does not write; display_Base() writes both RAMs (vendor sequence).
+    blank = b"\xff" * (((epd.width + 7) // 8) * epd.height)
+    epd.display_Base(blank)
+
 
+def display_full(epd, buf: bytes) -> None:
+    if not SKIP_STATUS_SCREENS:
+        # display_Partial() hardware-resets the panel; re-init before a full refresh
+        epd.init()
+    epd.display(buf)
 
-def render_qr_canvas(epd, font_info, font_main, payload_obj: Dict[str, Any], txhash: str) -> Image.Image:
+
+@lru_cache(maxsize=64)
+def _encode_qr(payload_str: str, border: int = 4) -> np.ndarray:
+    """
+    Reed-Solomon encode + module placement (pure Python, the costly part).
+    Memoized so replayed/identical payloads skip it. Returns a read-only
+    bool matrix (True = dark module) including the quiet-zone border.
+
+    Most of the time goes to the best-mask search (8 full placements +
+    penalty scoring); QR_MASK_PATTERN skips it.
+    """
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=border,
+        mask_pattern=QR_MASK_PATTERN,
+    )
+    qr.add_data(payload_str)
+    qr.make(fit=True)
+    matrix = np.asarray(qr.get_matrix(), dtype=bool)
+    matrix.flags.writeable = False
+    return matrix
+
+
+def qr_image(payload_str: str, qr_size: int) -> Image.Image:
+    matrix = _encode_qr(payload_str)
+    # largest integer module size that fits qr_size (no resample pass)
+    box = max(1, qr_size // matrix.shape[0])
+    dark = np.repeat(np.repeat(matrix, box, axis=0), box, axis=1)
+    h, w = dark.shape
+    # mode "1" raw data: 1 bit/pixel, set bit = white
+    return Image.frombytes("1", (w, h), np.packbits(~dark, axis=1).tobytes())
+
+
+def build_background(epd, font_info, font_main, node_id: str) -> Image.Image:
+    """
+    Pre-render the static part of the QR screen (labels, and the node id,
+    which is fixed for the run). render_qr_canvas() copies this instead of
+    redrawing it.
+    """
+    background = Image.new("1", (epd.width, epd.height), 255)
+    draw = ImageDraw.Draw(background)
+
+    # Top info (ASCII only); NODE_ID comes from the environment, so sanitize it
+    draw.text((10, 5), "Node ID:", font=font_info, fill=0)
+    draw.text((10, 21), safe_text(node_id), font=font_main, fill=0)
+    draw.text((10, 47), "Timestamp:", font=font_info, fill=0)
+
+    return background
+
+
+def render_qr_canvas(
+    epd,
+    background: Image.Image,
+    font_info,
+    font_main,
+    payload_obj: Dict[str, Any],
+    txhash: str,
+) -> Image.Image:
     payload_for_qr = dict(payload_obj)
     if INCLUDE_TXHASH_IN_QR and txhash:
         payload_for_qr["txhash"] = txhash
 
     qr_payload = json.dumps(payload_for_qr, ensure_ascii=False, separators=(",", ":"))
 
-    qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=4, border=4)
-    qr.add_data(qr_payload)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white")
+    qr_size = 180
+    qr_img = qr_image(qr_payload, qr_size)
 
-    canvas = Image.new("1", (epd.width, epd.height), 255)
+    canvas = background.copy()
     draw = ImageDraw.Draw(canvas)
 
-    # Top info (ASCII only)
-    draw.text((10, 5), "Node ID:", font=font_info, fill=0)
-    draw.text((10, 21), safe_text(payload_obj["node_id"]), font=font_main, fill=0)
-
-    draw.text((10, 47), "Timestamp:", font=font_info, fill=0)
-    draw.text((10, 63), safe_text(payload_obj["timestamp"]), font=font_info, fill=0)
+    # Per-trial fields; labels and node id are already on the background.
+    # timestamp (strftime digits), qr_id (uuid hex) and txhash (hex) are ASCII
+    # by construction, so they skip safe_text().
+    draw.text((10, 63), payload_obj["timestamp"], font=font_info, fill=0)
 
     qr_id = payload_obj["qr_id"]
-    draw.text((10, 89), safe_text(f"(QR ID: {qr_id[8:]})"), font=font_info, fill=0)
+    draw.text((10, 89), f"(QR ID: {qr_id[8:]})", font=font_info, fill=0)
 
     if txhash:
         short = txhash[-10:]
-        draw.text((10, 105), safe_text(f"Tx: ..{short}"), font=font_info, fill=0)
+        draw.text((10, 105), f"Tx: ..{short}", font=font_info, fill=0)
     else:
         draw.text((10, 105), "Tx: (failed)", font=font_info, fill=0)
 
-    # Main QR
-    qr_size = 180
-    qr_img_resized = qr_img.resize((qr_size, qr_size))
-    qr_x = (epd.width - qr_size) // 2
-    qr_y = epd.height - qr_size
-    canvas.paste(qr_img_resized, (qr_x, qr_y))
+    # Main QR (centered in the qr_size x qr_size area at the bottom)
+    qr_px = qr_img.size[0]
+    qr_x = (epd.width - qr_px) // 2
+    qr_y = epd.height - qr_size + (qr_size - qr_px) // 2
+    canvas.paste(qr_img, (qr_x, qr_y))
 
     return canvas
 
@@ -471,22 +551,211 @@ def load_emulation_profile() -> Optional[EmulationProfile]:
     return profile
 
 
+class NodeSendWorker:
+    """
+    Long-lived `node send_set_value.js` process. Requests/responses are one
+    JSON object per line on stdin/stdout, so Node startup and SDK init are
+    paid once per run instead of once per trial. If the worker dies or
+    times out it is killed and respawned on the next request.
+
+    Every request carries an "id" that the reply echoes, and the worker
+    writes STDERR_MARKER + id to stderr after each reply, so both the reply
+    and the stderr text are attributed to the request that produced them.
+    """
+
+    STDERR_MARKER = "\x1e"
+    STDERR_MARKER_WAIT_SEC = 2.0
+
+    def __init__(self, send_timeout_sec: float):
+        self.send_timeout_sec = send_timeout_sec
+        self.proc: Optional[subprocess.Popen] = None
+        self._next_id = 0
+        self._stderr_q: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stderr_thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        env = os.environ.copy()
+        env["NODE_BROADCAST_TIMEOUT_SEC"] = env.get("NODE_BROADCAST_TIMEOUT_SEC", str(self.send_timeout_sec))
+
+        self.proc = subprocess.Popen(
+            [NODE_BIN, SEND_JS],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(BASE_DIR),
+            env=env,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        self._stderr_q = queue.Queue()
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, args=(self.proc, self._stderr_q), daemon=True
+        )
+        self._stderr_thread.start()
+
+    @staticmethod
+    def _drain_stderr(proc: subprocess.Popen, q: "queue.Queue[Optional[str]]") -> None:
+        for line in proc.stderr:
+            q.put(line)
+        q.put(None)  # EOF
+
+    def _take_stderr(self, req_id: Optional[int], wait_sec: float) -> str:
+        """
+        Collect stderr lines up to this request's marker (waiting at most
+        wait_sec for the reader thread to catch up). req_id=None just
+        drains whatever is already queued.
+        """
+        marker = f"{self.STDERR_MARKER}{req_id}" if req_id is not None else None
+        deadline = time.monotonic() + wait_sec
+        lines: List[str] = []
+        while True:
+            try:
+                if marker is None:
+                    line = self._stderr_q.get_nowait()
+                else:
+                    line = self._stderr_q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if line is None:
+                break
+            if line.startswith(self.STDERR_MARKER):
+                if line.rstrip("\n") == marker:
+                    break
+                continue  # marker of an earlier (timed-out) request
+            lines.append(line)
+        return "".join(lines)
+
+    def _reap(self) -> Optional[int]:
+        proc = self.proc
+        self.proc = None
+        if proc is None:
+            return None
+        if proc.poll() is None:
+            proc.kill()
+        try:
+            rc = proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            rc = None
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=1)
+        return rc
+
+    def request(self, line: str) -> Tuple[str, str, Any]:
+        """
+        Send one request line (a JSON object) and wait for its reply line.
+        Returns (stdout_line, stderr_text, returncode). returncode mirrors
+        what the one-shot script's exit status would have been (0 if the
+        reply is ok, 1 otherwise) while the worker is alive, or the real
+        exit code if it died. Raises subprocess.TimeoutExpired after
+        send_timeout_sec (the worker is killed by a watchdog).
+        """
+        if self.proc is None or self.proc.poll() is not None:
+            if self.proc is not None:
+                self._reap()
+            self.start()
+        proc = self.proc
+
+        self._next_id += 1
+        req_id = self._next_id
+        # tag the already-encoded JSON object with the request id
+        tagged = f'{{"id":{req_id},{line[1:]}'
+
+        timed_out = threading.Event()
+
+        def _on_timeout() -> None:
+            timed_out.set()
+            proc.kill()
+
+        # non-reply stdout lines (stray logs) are kept and reported as stderr
+        stray: List[str] = []
+        reply: Optional[Dict[str, Any]] = None
+        out = ""
+
+        watchdog = threading.Timer(self.send_timeout_sec, _on_timeout)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            proc.stdin.write(tagged + "\n")
+            proc.stdin.flush()
+            while True:
+                out = proc.stdout.readline()
+                if not out:
+                    break
+                try:
+                    j = json.loads(out)
+                except ValueError:
+                    j = None
+                if isinstance(j, dict) and j.get("id") == req_id:
+                    reply = j
+                    break
+                stray.append(out)
+        except OSError:
+            out = ""
+        finally:
+            watchdog.cancel()
+
+        if timed_out.is_set():
+            self._reap()
+            self._take_stderr(None, 0)
+            raise subprocess.TimeoutExpired([NODE_BIN, SEND_JS], self.send_timeout_sec)
+
+        stray_text = "".join(f"[stdout] {x}" for x in stray)
+
+        if reply is None:
+            # worker exited (e.g. missing env); its last stdout line is usually
+            # the fatal-error JSON, so hand that back like the one-shot script did
+            rc = self._reap()
+            last = stray.pop() if stray else ""
+            stray_text = "".join(f"[stdout] {x}" for x in stray)
+            return last, stray_text + self._take_stderr(None, 0), rc
+
+        err = self._take_stderr(req_id, self.STDERR_MARKER_WAIT_SEC)
+        return out, stray_text + err, 0 if reply.get("ok") else 1
+
+    def close(self) -> None:
+        proc = self.proc
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            pass
+        self._reap()
+
+
+def encode_send_request(value: Union[str, Dict[str, Any]], memo: str) -> Tuple[str, int]:
+    """
+    Build the one-line request for send_set_value.js and return it with the
+    length of the on-chain value string. value may be the payload object
+    itself; Node stringifies it for the contract, so the payload is
+    serialized exactly once here (no nested JSON string) and that same
+    serialization gives value_len.
+    """
+    if isinstance(value, str):
+        value_json = json.dumps(value, ensure_ascii=False)
+        value_len = len(value)
+    else:
+        value_json = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        value_len = len(value_json)
+    memo_json = json.dumps(memo, ensure_ascii=False)
+    return f'{{"value":{value_json},"memo":{memo_json}}}', value_len
+
+
 def call_node_send(
-    value: str,
-    memo: str,
+    inp: str,
+    worker: NodeSendWorker,
     emulator: Optional[NetworkEmulator],
     send_timeout_sec: float,
 ) -> Dict[str, Any]:
-    inp_obj = {"value": value, "memo": memo}
-    inp = json.dumps(inp_obj, ensure_ascii=False).encode("utf-8")
+    tx_bytes = len(inp.encode("utf-8"))
     event = EmulationEvent()
 
-    env = os.environ.copy()
-    env["NODE_BROADCAST_TIMEOUT_SEC"] = env.get("NODE_BROADCAST_TIMEOUT_SEC", str(send_timeout_sec))
-
     try:
         if emulator is not None:
-            event = emulator.before_request(tx_bytes=len(inp), timeout_s=send_timeout_sec)
+            event = emulator.before_request(tx_bytes=tx_bytes, timeout_s=send_timeout_sec)
     except EmulatedTimeout as e:
         return {
             "ok": False,
@@ -505,15 +774,7 @@ def call_node_send(
         }
 
     try:
-        p = subprocess.run(
-            [NODE_BIN, SEND_JS],
-            input=inp,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=str(BASE_DIR),
-            timeout=send_timeout_sec,
-            env=env,
-        )
+        out, err, returncode = worker.request(inp)
     except subprocess.TimeoutExpired:
         event.stage = event.stage or "subprocess"
         event.note = event.note or "node subprocess timeout"
@@ -525,14 +786,16 @@ def call_node_send(
             "emulation": event.as_dict(),
         }
 
-    out = p.stdout.decode("utf-8", errors="replace").strip()
-    err = p.stderr.decode("utf-8", errors="replace").strip()
-    rx_bytes = len(p.stdout) + len(p.stderr)
+    rx_bytes = len(out.encode("utf-8")) + len(err.encode("utf-8"))
+    out = out.strip()
+    err = err.strip()
 
     try:
         j = json.loads(out) if out else {"ok": False, "error": "empty stdout", "error_type": "EmptyStdout"}
     except Exception:
         j = {"ok": False, "error": f"stdout not json: {out[:200]}", "error_type": "InvalidJsonStdout"}
+    if isinstance(j, dict):
+        j.pop("id", None)  # worker protocol tag, not a result field
 
     if err:
         j["stderr"] = err[:2000]
@@ -545,7 +808,7 @@ def call_node_send(
                 "ok": False,
                 "error": str(e),
                 "error_type": "EmulatedTimeout",
-                "subprocess_returncode": p.returncode,
+                "subprocess_returncode": returncode,
                 "node_result_ok": j.get("ok", False),
                 "node_txhash_hint": j.get("txhash", ""),
                 "emulation": event.as_dict(),
@@ -555,34 +818,117 @@ def call_node_send(
                 "ok": False,
                 "error": str(e),
                 "error_type": "EmulatedNetworkError",
-                "subprocess_returncode": p.returncode,
+                "subprocess_returncode": returncode,
                 "node_result_ok": j.get("ok", False),
                 "node_txhash_hint": j.get("txhash", ""),
                 "emulation": event.as_dict(),
             }
 
-    j["subprocess_returncode"] = p.returncode
+    j["subprocess_returncode"] = returncode
     j["emulation"] = event.as_dict()
     return j
 
 
-def append_csv(row: Dict[str, Any], csv_filename: str) -> None:
-    path = Path(csv_filename)
-    file_exists = path.exists()
-    fieldnames = list(row.keys())
-    with path.open("a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
-        if not file_exists:
-            w.writeheader()
-        w.writerow(row)
+CSV_FIELDNAMES: List[str] = [
+    "trial",
+    "local_time",
+    "node_id",
+    "qr_id",
+    "unique_id",
+    "tx_ok",
+    "txhash",
+    # Spec timings
+    "txhash_ms",
+    "display_ms",
+    "total_ms",
+    # Node details
+    "broadcast_ms_node",
+    "height",
+    "code",
+    "gasWanted",
+    "gasUsed",
+    "timestamp_chain",
+    "sender",
+    "contract",
+    "network",
+    "value_len",
+    "subprocess_returncode",
+    "error_type",
+    "error",
+    "stderr",
+    # Emulation details
+    "net_emulation",
+    "net_profile_source",
+    "net_profile_name",
+    "net_seed",
+    "net_base_rtt_ms",
+    "net_jitter_ms",
+    "net_uplink_kbps",
+    "net_downlink_kbps",
+    "net_loss_prob",
+    "net_timeout_prob",
+    "net_outage_prob_per_call",
+    "net_outage_duration_min_s",
+    "net_outage_duration_max_s",
+    "net_tx_bytes",
+    "net_rx_bytes",
+    "net_pre_delay_ms",
+    "net_post_delay_ms",
+    "net_outage_active",
+    "net_outage_started",
+    "net_timeout_injected",
+    "net_loss_injected",
+    "net_stage",
+    "net_note",
+]
+
+
+@dataclass
+class CsvLogger:
+    """
+    Keeps the log CSV open for the whole run. The file is checked/opened
+    once at startup and the header is written right away if it is new;
+    every row is flushed + fsynced so a power loss on the Pi does not drop
+    finished trials.
+    """
+
+    path: Path
+    fieldnames: List[str]
+    f: Optional[IO[str]] = None
+    writer: Optional[csv.DictWriter] = None
+
+    @classmethod
+    def open(cls, path: Path, fieldnames: List[str]) -> "CsvLogger":
+        need_header = not path.exists()
+        f = path.open("a", newline="", encoding="utf-8")
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if need_header:
+            writer.writeheader()
+            f.flush()
+        return cls(path=path, fieldnames=fieldnames, f=f, writer=writer)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.writer.writerow(row)
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+        self.f = None
+        self.writer = None
 
 
 def main():
     epd = None
     emulator: Optional[NetworkEmulator] = None
     profile: Optional[EmulationProfile] = None
+    csv_logger: Optional[CsvLogger] = None
+    node_worker = NodeSendWorker(send_timeout_sec=NODE_SEND_TIMEOUT_SEC)
 
     try:
+        csv_logger = CsvLogger.open(Path(CSV_FILENAME), CSV_FIELDNAMES)
+
         if NET_EMULATION:
             profile = load_emulation_profile()
             if profile is not None:
@@ -590,7 +936,7 @@ def main():
 
         epd = epd2in7.EPD()
         epd.init()
-        epd.Clear()
+        clear_screen(epd)
 
         # Fonts: if Font.ttc exists, it can render Unicode; otherwise default (ASCII safest)
         font_path = os.path.join(picdir, "Font.ttc")
@@ -605,9 +951,20 @@ def main():
             font_success = ImageFont.load_default()
             font_error = ImageFont.load_default()
 
+        background = build_background(epd, font_info, font_main, NODE_ID)
+        if not SKIP_STATUS_SCREENS:
+            # pre-render the fixed status screens before the first trial's t0
+            _status_frame(epd, font_success, "Sending TX...")
+            _status_frame(epd, font_success, "TX OK - Display")
+            _status_frame(epd, font_error, "TX FAIL - Display")
+
+        # spawn Node once; SDK init happens before the first trial's t0
+        node_worker.start()
+
         logging.info("SPEC LOOP: payload -> tx (txhash) -> display -> csv (Ctrl+C to stop)")
         logging.info(f"GPIOZERO_PIN_FACTORY={os.environ.get('GPIOZERO_PIN_FACTORY')}")
         logging.info(f"SEND_FULL_PAYLOAD={int(SEND_FULL_PAYLOAD)} INCLUDE_TXHASH_IN_QR={int(INCLUDE_TXHASH_IN_QR)}")
+        logging.info(f"SKIP_STATUS_SCREENS={int(SKIP_STATUS_SCREENS)} QR_MASK_PATTERN={'auto' if QR_MASK_PATTERN is None else QR_MASK_PATTERN}")
         logging.info(f"NODE_SEND_TIMEOUT_SEC={NODE_SEND_TIMEOUT_SEC}")
         if profile is not None:
             logging.info(
@@ -633,36 +990,37 @@ def main():
                 break
 
             # t0: payload generation start
-            t0 = Timing.now_ns()
+            t0 = time.perf_counter_ns()
             payload = make_payload(NODE_ID)
             qr_id = payload["qr_id"]
             unique_id = payload["unique_id"]
 
-            if SEND_FULL_PAYLOAD:
-                value_onchain = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
-            else:
-                value_onchain = unique_id
-
+            value_onchain: Union[str, Dict[str, Any]] = payload if SEND_FULL_PAYLOAD else unique_id
             memo = f"qr:{qr_id[:12]}"
+            send_request, value_len = encode_send_request(value_onchain, memo)
 
-            display_message(epd, font_success, "Sending TX...")
+            if not SKIP_STATUS_SCREENS:
+                display_message(epd, font_success, "Sending TX...")
             res = call_node_send(
-                value=value_onchain,
-                memo=memo,
+                inp=send_request,
+                worker=node_worker,
                 emulator=emulator,
                 send_timeout_sec=NODE_SEND_TIMEOUT_SEC,
             )
-            t1 = Timing.now_ns()
+            t1 = time.perf_counter_ns()
 
             ok = bool(res.get("ok", False))
             txhash = str(res.get("txhash", "")) if ok else ""
 
-            display_message(epd, font_success if ok else font_error, "TX OK - Display" if ok else "TX FAIL - Display")
-            canvas = render_qr_canvas(epd, font_info, font_main, payload, txhash)
-            epd.display(epd.getbuffer(canvas))
-            t2 = Timing.now_ns()
+            if not SKIP_STATUS_SCREENS:
+                display_message(epd, font_success if ok else font_error, "TX OK - Display" if ok else "TX FAIL - Display")
+            canvas = render_qr_canvas(epd, background, font_info, font_main, payload, txhash)
+            display_full(epd, fast_getbuffer(epd, canvas))
+            t2 = time.perf_counter_ns()
 
-            timing = Timing(t0_ns=t0, t1_ns=t1, t2_ns=t2)
+            txhash_ms = (t1 - t0) / 1e6
+            display_ms = (t2 - t1) / 1e6
+            total_ms = (t2 - t0) / 1e6
             emu = res.get("emulation", {}) if isinstance(res.get("emulation"), dict) else {}
 
             row = {
@@ -674,9 +1032,9 @@ def main():
                 "tx_ok": ok,
                 "txhash": txhash,
                 # Spec timings
-                "txhash_ms": round(timing.txhash_ms, 3),
-                "display_ms": round(timing.display_ms, 3),
-                "total_ms": round(timing.total_ms, 3),
+                "txhash_ms": round(txhash_ms, 3),
+                "display_ms": round(display_ms, 3),
+                "total_ms": round(total_ms, 3),
                 # Node details
                 "broadcast_ms_node": res.get("broadcast_ms", ""),
                 "height": res.get("height", ""),
@@ -687,7 +1045,7 @@ def main():
                 "sender": res.get("sender", ""),
                 "contract": res.get("contract", ""),
                 "network": res.get("network", ""),
-                "value_len": len(value_onchain),
+                "value_len": value_len,
                 "subprocess_returncode": res.get("subprocess_returncode", ""),
                 "error_type": res.get("error_type", ""),
                 "error": res.get("error", ""),
@@ -717,7 +1075,7 @@ def main():
                 "net_stage": emu.get("stage", ""),
                 "net_note": emu.get("note", ""),
             }
-            append_csv(row, CSV_FILENAME)
+            csv_logger.write(row)
 
             logging.info(
                 "[%d] ok=%s txhash_ms=%.3f display_ms=%.3f total_ms=%.3f txhash=%s error_type=%s net_stage=%s pre_ms=%s post_ms=%s",
@@ -736,13 +1094,16 @@ def main():
             if DISPLAY_HOLD_SEC > 0:
                 time.sleep(DISPLAY_HOLD_SEC)
 
-            epd.Clear()
+            clear_screen(epd)
             if SLEEP_BETWEEN_SEC > 0:
                 time.sleep(SLEEP_BETWEEN_SEC)
 
     except KeyboardInterrupt:
         logging.info("ctrl + c")
     finally:
+        node_worker.close()
+        if csv_logger is not None:
+            csv_logger.close()
         if epd is not None:
             try:
                 epd.Clear()
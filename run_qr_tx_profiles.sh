@@ -31,6 +31,9 @@ NODE_SEND_TIMEOUT_SEC="${NODE_SEND_TIMEOUT_SEC:-60}"
 SEND_FULL_PAYLOAD="${SEND_FULL_PAYLOAD:-1}"
 INCLUDE_TXHASH_IN_QR="${INCLUDE_TXHASH_IN_QR:-1}"
 
+# 送信中/送信結果のステータス画面を省略（1=省略して QR 表示の1回だけ描画）
+SKIP_STATUS_SCREENS="${SKIP_STATUS_SCREENS:-1}"
+
 # 実験したい論理プロファイル名
 PROFILES=(
   "baseline"
@@ -90,6 +93,7 @@ for logical_profile in "${PROFILES[@]}"; do
     echo "NODE_SEND_TIMEOUT_SEC=${NODE_SEND_TIMEOUT_SEC}"
     echo "SEND_FULL_PAYLOAD=${SEND_FULL_PAYLOAD}"
     echo "INCLUDE_TXHASH_IN_QR=${INCLUDE_TXHASH_IN_QR}"
+    echo "SKIP_STATUS_SCREENS=${SKIP_STATUS_SCREENS}"
   } > "${config_txt}"
 
   echo
@@ -111,6 +115,7 @@ for logical_profile in "${PROFILES[@]}"; do
     SLEEP_BETWEEN_SEC="${SLEEP_BETWEEN_SEC}" \
     SEND_FULL_PAYLOAD="${SEND_FULL_PAYLOAD}" \
     INCLUDE_TXHASH_IN_QR="${INCLUDE_TXHASH_IN_QR}" \
+    SKIP_STATUS_SCREENS="${SKIP_STATUS_SCREENS}" \
     NET_EMULATION="${NET_EMULATION}" \
     NET_PROFILE_NAME="${actual_profile}" \
     NODE_SEND_TIMEOUT_SEC="${NODE_SEND_TIMEOUT_SEC}" \
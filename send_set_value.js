@@ -1,5 +1,7 @@
 import "dotenv/config";
 
+import readline from "node:readline";
+
 import { Network, getNetworkEndpoints } from "@injectivelabs/networks";
 import { PrivateKey } from "@injectivelabs/sdk-ts/core/accounts";
 import { MsgBroadcasterWithPk } from "@injectivelabs/sdk-ts/core/tx";
@@ -34,12 +36,19 @@ function resolveNetwork(networkName) {
   }
 }
 
-async function readStdin() {
-  const chunks = [];
-  for await (const c of process.stdin) chunks.push(c);
-  const s = Buffer.concat(chunks).toString("utf-8").trim();
-  if (!s) throw new Error("stdin is empty (expected JSON)");
-  return JSON.parse(s);
+function createContext() {
+  const network = resolveNetwork(process.env.INJ_NETWORK);
+  const pk = PrivateKey.fromMnemonic(MNEMONIC);
+  const address = pk.toAddress().toBech32();
+
+  const endpoints = getNetworkEndpoints(network);
+  const broadcaster = new MsgBroadcasterWithPk({
+    privateKey: pk,
+    network,
+    endpoints,
+  });
+
+  return { network, address, broadcaster };
 }
 
 function withTimeout(promise, timeoutMs, label = "operation") {
@@ -59,18 +68,16 @@ function pickTxHash(res) {
   return res?.txhash || res?.txHash || "";
 }
 
-async function main() {
-  const input = await readStdin();
-
-  const value = input.value;
+async function handleRequest(ctx, input) {
+  // value may arrive as a JSON object (full payload); the contract stores a string
+  const value =
+    input.value !== null && typeof input.value === "object" ? JSON.stringify(input.value) : input.value;
   const memo = input.memo ?? "set_value from python";
   if (typeof value !== "string" || value.length === 0) {
     throw new Error("input.value must be non-empty string");
   }
 
-  const network = resolveNetwork(process.env.INJ_NETWORK);
-  const pk = PrivateKey.fromMnemonic(MNEMONIC);
-  const address = pk.toAddress().toBech32();
+  const { network, address, broadcaster } = ctx;
 
   const msg = MsgExecuteContract.fromJSON({
     contractAddress: CONTRACT,
@@ -81,13 +88,6 @@ async function main() {
     },
   });
 
-  const endpoints = getNetworkEndpoints(network);
-  const broadcaster = new MsgBroadcasterWithPk({
-    privateKey: pk,
-    network,
-    endpoints,
-  });
-
   const t0 = nowNs();
   const res = await withTimeout(
     broadcaster.broadcast({
@@ -100,7 +100,7 @@ async function main() {
   );
   const t1 = nowNs();
 
-  const out = {
+  return {
     ok: true,
     txhash: pickTxHash(res),
     broadcast_ms: Number(nsToMs(t1 - t0).toFixed(3)),
@@ -115,17 +115,62 @@ async function main() {
     memo,
     value_len: value.length,
   };
-
-  process.stdout.write(JSON.stringify(out));
 }
 
-main().catch((e) => {
-  const err = {
+function errorResult(e) {
+  return {
     ok: false,
     error: e?.message ?? String(e),
     error_type: e?.name ?? "Error",
     stack: typeof e?.stack === "string" ? e.stack.split("\n").slice(0, 6).join(" | ") : "",
   };
-  process.stdout.write(JSON.stringify(err));
+}
+
+// Marks the end of one request's stderr output so the caller can attribute
+// warnings to the right trial (ASCII RS + request id).
+function writeStderrMarker(id) {
+  process.stderr.write(`\x1e${id ?? ""}\n`);
+}
+
+// One JSON request per stdin line -> one JSON response per stdout line.
+// The process stays alive until stdin is closed, so module loading and the
+// SDK/key setup are paid once per run instead of once per Tx.
+// Each reply echoes the request's "id", and is followed by a stderr marker.
+async function main() {
+  // stdout carries only replies; send library console.log output to stderr
+  console.log = console.error;
+  console.info = console.error;
+
+  const ctx = createContext();
+  const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+  let handled = 0;
+  for await (const line of rl) {
+    const s = line.trim();
+    if (!s) continue;
+    handled += 1;
+
+    let id = null;
+    let out;
+    try {
+      const input = JSON.parse(s);
+      id = input.id ?? null;
+      out = await handleRequest(ctx, input);
+    } catch (e) {
+      out = errorResult(e);
+      process.exitCode = 1;
+    }
+    out.id = id;
+    process.stdout.write(JSON.stringify(out) + "\n");
+    writeStderrMarker(id);
+  }
+
+  if (handled === 0) {
+    throw new Error("stdin is empty (expected JSON)");
+  }
+}
+
+main().catch((e) => {
+  process.stdout.write(JSON.stringify(errorResult(e)) + "\n");
   process.exit(1);
-});
\ No newline at end of file
+});